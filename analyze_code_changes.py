@@ -14,7 +14,8 @@
 
 import os
 import sys
-import json
+import orjson
+import functools
 from groq import Groq
 
 # Set up Groq credentials
@@ -22,20 +23,34 @@ if not os.environ.get("GROQ_API_KEY"):
     print("No Groq API key found")
     sys.exit(1)
 
-client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+@functools.lru_cache(maxsize=1)
+def get_groq_client():
+    """Return a shared Groq client so its HTTP connection pool is reused"""
+    return Groq(api_key=os.environ["GROQ_API_KEY"])
 
-model_engine = os.environ["MODEL"]
-commit_title = os.environ["COMMIT_TITLE"]
-commit_message = os.environ["COMMIT_BODY"]
-max_length = int(os.environ["MAX_LENGTH"])
-
-# Analyze the code changes
-code = sys.stdin.read()
-header = (f"Commit title is '{commit_title}'\n"
-          f"and commit message is '{commit_message}'\n")
+def strip_code_fence(text):
+    """Return the contents of a markdown code block, or text if it is bare JSON"""
+    if text[:1] == '[':
+        return text
+    start = text.find("```json")
+    if start != -1:
+        start += len("```json")
+    else:
+        start = text.find("```")
+        if start == -1:
+            return text
+        start += len("```")
+    # The closing fence starts a line; fences inside JSON strings cannot,
+    # since a raw newline is not valid there
+    end = text.find("\n```", start)
+    if end == -1:
+        end = text.find("```", start)
+    if end == -1:
+        end = len(text)
+    return text[start:end].strip()
 
 # Enhanced prompt for structured output
-enhanced_prompt = f"""You are an expert code reviewer. Review the following git diff and provide structured feedback.
+_PROMPT_TEMPLATE = """You are an expert code reviewer. Review the following git diff and provide structured feedback.
 
 For each issue you find, provide:
 1. The file path
@@ -68,6 +83,39 @@ Commit context:
 
 Return ONLY the JSON array, no other text."""
 
+model_engine = os.environ["MODEL"]
+commit_title = os.environ["COMMIT_TITLE"]
+commit_message = os.environ["COMMIT_BODY"]
+max_length = int(os.environ["MAX_LENGTH"])
+
+# Analyze the code changes; read all of stdin so a piped writer never
+# sees a closed pipe, and decode once so binary hunks cannot abort the read
+code = sys.stdin.buffer.read().decode('utf-8', 'replace')
+header = (f"Commit title is '{commit_title}'\n"
+          f"and commit message is '{commit_message}'\n")
+
+# Trim the diff and commit context rather than the whole prompt, so the
+# instructions after them always reach the model
+available = max(max_length - len(_PROMPT_TEMPLATE.format(
+    code="", commit_title="", commit_message="")), 0)
+
+# Commit context may use whatever the diff leaves free, but never more
+# than a quarter of the room, so a long PR description cannot crowd out
+# the diff; the message is cut before the title
+context_budget = max(available - len(code), available // 4)
+if len(commit_title) + len(commit_message) > context_budget:
+    commit_message = commit_message[:max(context_budget - len(commit_title), 0)]
+    commit_title = commit_title[:context_budget]
+
+diff_budget = max(available - len(commit_title) - len(commit_message), 0)
+if len(code) > diff_budget:
+    print(f"Diff too long for {max_length} character prompt, "
+          f"sending only first {diff_budget} characters", file=sys.stderr)
+    code = code[:diff_budget]
+
+enhanced_prompt = _PROMPT_TEMPLATE.format(
+    code=code, commit_title=commit_title, commit_message=commit_message)
+
 if len(enhanced_prompt) > max_length:
     print(f"Prompt too long: {len(enhanced_prompt)} characters, "
           f"sending only first {max_length} characters", file=sys.stderr)
@@ -83,45 +131,49 @@ kwargs['messages'] = [
 ]
 
 try:
-    response = client.chat.completions.create(**kwargs)
-    if response.choices:
-        review_text = response.choices[0].message.content.strip()
+    response = get_groq_client().chat.completions.create(stream=True, **kwargs)
+    # Collect tokens as they arrive instead of waiting for the full body
+    parts = []
+    has_choices = False
+    for chunk in response:
+        if chunk.choices:
+            has_choices = True
+            parts.append(chunk.choices[0].delta.content or "")
+    if has_choices:
+        review_text = "".join(parts).strip()
         
         # Try to parse as JSON
         try:
             # Extract JSON if wrapped in markdown code blocks
-            if "```json" in review_text:
-                review_text = review_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in review_text:
-                review_text = review_text.split("```")[1].split("```")[0].strip()
+            review_text = strip_code_fence(review_text)
             
-            reviews = json.loads(review_text)
+            reviews = orjson.loads(review_text)
             
             # Output structured JSON for processing
-            print(json.dumps(reviews, indent=2))
+            print(orjson.dumps(reviews, option=orjson.OPT_INDENT_2).decode())
             
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             # Fallback: treat as plain text review
-            print(json.dumps([{
+            print(orjson.dumps([{
                 "file": "general",
                 "line": 0,
                 "severity": "SUGGESTION",
                 "message": review_text,
                 "suggestion": ""
-            }], indent=2))
+            }], option=orjson.OPT_INDENT_2).decode())
     else:
-        print(json.dumps([{
+        print(orjson.dumps([{
             "file": "error",
             "line": 0,
             "severity": "CRITICAL",
-            "message": f"No response from Groq: {response}",
+            "message": "No response from Groq",
             "suggestion": ""
-        }], indent=2))
+        }], option=orjson.OPT_INDENT_2).decode())
 except Exception as e:
-    print(json.dumps([{
+    print(orjson.dumps([{
         "file": "error",
         "line": 0,
         "severity": "CRITICAL",
         "message": f"Groq API error: {e}",
         "suggestion": ""
-    }], indent=2))
+    }], option=orjson.OPT_INDENT_2).decode())
@@ -13,50 +13,52 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
 import sys
-import json
+import orjson
+
+_SEVERITY_EMOJI = {
+    'CRITICAL': '🔴',
+    'WARNING': '🟡',
+    'SUGGESTION': '🟢',
+    'INFO': '💡'
+}
 
 def severity_emoji(severity):
     """Return emoji for severity level"""
-    emoji_map = {
-        'CRITICAL': '🔴',
-        'WARNING': '🟡',
-        'SUGGESTION': '🟢',
-        'INFO': '💡'
-    }
-    return emoji_map.get(severity.upper(), '💬')
+    return _SEVERITY_EMOJI.get(severity.upper(), '💬')
 
 def format_reviews(reviews):
     """Format reviews as markdown"""
     if not reviews:
         return "✅ No issues found! Code looks good."
     
-    # Group by severity
-    critical = [r for r in reviews if r.get('severity', '').upper() == 'CRITICAL']
-    warnings = [r for r in reviews if r.get('severity', '').upper() == 'WARNING']
-    suggestions = [r for r in reviews if r.get('severity', '').upper() == 'SUGGESTION']
-    others = [r for r in reviews if r.get('severity', '').upper() not in ['CRITICAL', 'WARNING', 'SUGGESTION']]
+    # Group by severity in a single pass
+    buckets = {'CRITICAL': [], 'WARNING': [], 'SUGGESTION': [], 'OTHER': []}
+    for r in reviews:
+        buckets.get(r.get('severity', '').upper(), buckets['OTHER']).append(r)
+    critical = buckets['CRITICAL']
+    warnings = buckets['WARNING']
+    suggestions = buckets['SUGGESTION']
+    others = buckets['OTHER']
     
-    output = []
+    buf = io.StringIO()
     
     # Summary
-    output.append(f"## Summary")
-    output.append(f"Found **{len(reviews)}** review items:")
+    buf.write(f"## Summary\nFound **{len(reviews)}** review items:\n")
     if critical:
-        output.append(f"- 🔴 {len(critical)} Critical")
+        buf.write(f"- 🔴 {len(critical)} Critical\n")
     if warnings:
-        output.append(f"- 🟡 {len(warnings)} Warnings")
+        buf.write(f"- 🟡 {len(warnings)} Warnings\n")
     if suggestions:
-        output.append(f"- 🟢 {len(suggestions)} Suggestions")
-    output.append("")
+        buf.write(f"- 🟢 {len(suggestions)} Suggestions\n")
     
     # Details
     for category, items in [("Critical Issues", critical), ("Warnings", warnings), ("Suggestions", suggestions), ("Other", others)]:
         if not items:
             continue
         
-        output.append(f"## {category}")
-        output.append("")
+        buf.write(f"\n## {category}\n")
         
         for i, review in enumerate(items, 1):
             emoji = severity_emoji(review.get('severity', 'INFO'))
@@ -65,30 +67,21 @@ def format_reviews(reviews):
             message = review.get('message', '')
             suggestion = review.get('suggestion', '')
             
-            output.append(f"### {i}. {emoji} {file}")
-            if line > 0:
-                output.append(f"**Line {line}**")
-            output.append("")
-            output.append(message)
+            line_marker = f"**Line {line}**\n" if line > 0 else ""
+            buf.write(f"\n### {i}. {emoji} {file}\n{line_marker}\n{message}\n")
             
             if suggestion:
-                output.append("")
-                output.append("**Suggested fix:**")
-                output.append("```")
-                output.append(suggestion)
-                output.append("```")
+                buf.write(f"\n**Suggested fix:**\n```\n{suggestion}\n```\n")
             
-            output.append("")
-            output.append("---")
-            output.append("")
+            buf.write("\n---\n")
     
-    return "\n".join(output)
+    return buf.getvalue()
 
 def main():
     try:
-        reviews = json.load(sys.stdin)
+        reviews = orjson.loads(sys.stdin.buffer.read())
         print(format_reviews(reviews))
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         print(f"Error parsing review JSON: {e}")
         sys.exit(1)
 
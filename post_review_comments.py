@@ -15,54 +15,108 @@
 
 import os
 import sys
-import json
+import mmap
+import stat
+import orjson
+import bisect
 import requests
 import re
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-def parse_diff_for_line_mapping(diff_text):
+# Shared session so every GitHub API call reuses the same pooled connection.
+# Only connection failures are retried: the review POST is not idempotent,
+# and retrying it after a 502 could post the same review twice.
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(
+    max_retries=Retry(total=3, backoff_factor=0.3),
+    pool_maxsize=20
+))
+SESSION.headers.update({'Accept': 'application/vnd.github.v3+json'})
+
+# Diff headers, compiled once for the per-line scan below
+_FILE_RE = re.compile(r'\+\+\+ b/(.*)')
+_HUNK_RE = re.compile(r'@@ -\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@')
+
+def _iter_mmap_lines(mm):
+    """Yield decoded lines from a mapped diff, unmapping it when done"""
+    with mm:
+        for raw in iter(mm.readline, b''):
+            yield raw.decode('utf-8', 'replace')
+
+def _iter_file_lines(f):
+    """Yield lines from an open text file, closing it when done"""
+    with f:
+        yield from f
+
+def read_diff_lines(diff_file):
     """
-    Parse git diff to map file paths to changed line numbers.
+    Return an iterator over the decoded lines of the diff file.
+    Regular files are memory-mapped so only the pages being scanned need to
+    be resident; pipes, process substitutions and empty files are read
+    line by line instead.
+    """
+    st = os.stat(diff_file)
+    # mmap cannot map an empty file or anything other than a regular file
+    if stat.S_ISREG(st.st_mode) and st.st_size > 0:
+        with open(diff_file, 'rb') as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                mm = None
+        if mm is not None:
+            return _iter_mmap_lines(mm)
+    return _iter_file_lines(open(diff_file, encoding='utf-8', errors='replace'))
+
+def parse_diff_for_line_mapping(diff_lines):
+    """
+    Parse git diff lines to map file paths to changed line numbers.
+    Accepts any iterable of lines, with or without trailing newlines.
     Returns a dict: {file_path: [list of changed line numbers]}
     """
     file_lines = {}
     current_file = None
     current_line = 0
     
-    for line in diff_text.split('\n'):
-        # New file
-        if line.startswith('diff --git'):
-            current_file = None
-        elif line.startswith('+++'):
+    for line in diff_lines:
+        if line.endswith('\n'):
+            line = line[:-1]
+        prefix = line[:3]
+        if prefix == '+++':
             # Extract file path (remove +++ b/ prefix)
-            match = re.match(r'\+\+\+ b/(.*)', line)
+            match = _FILE_RE.match(line)
             if match:
                 current_file = match.group(1)
                 if current_file not in file_lines:
                     file_lines[current_file] = []
-        elif line.startswith('@@'):
+        elif prefix[:2] == '@@':
             # Parse hunk header: @@ -old_start,old_count +new_start,new_count @@
-            match = re.match(r'@@ -\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@', line)
+            match = _HUNK_RE.match(line)
             if match:
                 current_line = int(match.group(1))
-        elif current_file and line.startswith('+') and not line.startswith('+++'):
+        elif prefix == 'dif' and line.startswith('diff --git'):
+            # New file
+            current_file = None
+        elif current_file and prefix[:1] == '+':
             # This is an added line
             file_lines[current_file].append(current_line)
             current_line += 1
-        elif current_file and not line.startswith('-'):
+        elif current_file and prefix[:1] != '-':
             # Context line
             current_line += 1
     
     return file_lines
 
+_SEVERITY_EMOJI = {
+    'CRITICAL': '🔴',
+    'WARNING': '🟡',
+    'SUGGESTION': '🟢',
+    'INFO': '💡'
+}
+
 def severity_emoji(severity):
     """Return emoji for severity level"""
-    emoji_map = {
-        'CRITICAL': '🔴',
-        'WARNING': '🟡',
-        'SUGGESTION': '🟢',
-        'INFO': '💡'
-    }
-    return emoji_map.get(severity.upper(), '💬')
+    return _SEVERITY_EMOJI.get(severity.upper(), '💬')
 
 def format_review_comment(review):
     """Format a review comment with severity and suggestion"""
@@ -78,51 +132,56 @@ def format_review_comment(review):
     
     return comment
 
-def post_review_comments(github_token, repo, pr_number, commit_sha, reviews, diff_text):
+def post_review_comments(github_token, repo, pr_number, commit_sha, reviews, diff_lines):
     """
     Post inline review comments to GitHub PR.
     Uses GitHub's Pull Request Review API.
     """
     # Parse diff to get line mappings
-    file_lines = parse_diff_for_line_mapping(diff_text)
+    file_lines = parse_diff_for_line_mapping(diff_lines)
+    # Sorted, de-duplicated lines so the nearest one can be found by bisection
+    file_lines = {f: sorted(set(lines)) for f, lines in file_lines.items()}
     
     # Prepare review comments
     comments = []
     general_comment_parts = []
+    seen = set()
     
     for review in reviews:
         file = review.get('file', '')
         line = review.get('line', 0)
         
+        # Skip repeated findings, models often restate them at nearby lines;
+        # str() keeps the key hashable when a field is not a plain string
+        key = (str(file), str(review.get('severity')), str(review.get('message', '')))
+        if key in seen:
+            continue
+        seen.add(key)
+        
+        body = format_review_comment(review)
+        
         # Skip error entries
-        if file in ['error', 'general'] or line == 0:
-            general_comment_parts.append(format_review_comment(review))
+        if file in ('error', 'general') or line == 0:
+            general_comment_parts.append(body)
             continue
         
         # Find the closest changed line
-        if file in file_lines and file_lines[file]:
-            # Find the nearest changed line
-            changed_lines = file_lines[file]
-            if changed_lines:
-                # Use the closest changed line
-                closest_line = min(changed_lines, key=lambda x: abs(x - line))
-                
-                comments.append({
-                    'path': file,
-                    'line': closest_line,
-                    'body': format_review_comment(review)
-                })
-            else:
-                general_comment_parts.append(f"**{file}:{line}**\n{format_review_comment(review)}")
+        changed_lines = file_lines.get(file)
+        if changed_lines:
+            idx = bisect.bisect_left(changed_lines, line)
+            candidates = changed_lines[max(0, idx - 1):idx + 1]
+            closest_line = min(candidates, key=lambda x: abs(x - line))
+            
+            comments.append({
+                'path': file,
+                'line': closest_line,
+                'body': body
+            })
         else:
-            general_comment_parts.append(f"**{file}:{line}**\n{format_review_comment(review)}")
+            general_comment_parts.append(f"**{file}:{line}**\n{body}")
     
     # Create the review
     api_url = f"https://api.github.com/repos/{repo}/pulls/{pr_number}/reviews"
-    headers = {
-        'Authorization': f'Bearer {github_token}',
-        'Accept': 'application/vnd.github.v3+json'
-    }
     
     review_data = {
         'commit_id': commit_sha,
@@ -138,7 +197,11 @@ def post_review_comments(github_token, repo, pr_number, commit_sha, reviews, dif
     # Only post if we have comments or a body
     if comments or general_comment_parts:
         try:
-            response = requests.post(api_url, headers=headers, json=review_data)
+            response = SESSION.post(
+                api_url,
+                headers={'Authorization': f'Bearer {github_token}'},
+                json=review_data
+            )
             response.raise_for_status()
             print(f"✅ Posted review with {len(comments)} inline comments", file=sys.stderr)
             return True
@@ -164,22 +227,21 @@ def main():
     
     # Read reviews JSON from stdin
     try:
-        reviews = json.load(sys.stdin)
-    except json.JSONDecodeError as e:
+        reviews = orjson.loads(sys.stdin.buffer.read())
+    except orjson.JSONDecodeError as e:
         print(f"Failed to parse reviews JSON: {e}", file=sys.stderr)
         sys.exit(1)
     
     # Read diff file
     diff_file = os.environ.get('DIFF_FILE', 'diff.txt')
     try:
-        with open(diff_file, 'r') as f:
-            diff_text = f.read()
+        diff_lines = read_diff_lines(diff_file)
     except FileNotFoundError:
         print(f"Diff file not found: {diff_file}", file=sys.stderr)
-        diff_text = ""
+        diff_lines = []
     
     # Post comments
-    success = post_review_comments(github_token, repo, pr_number, commit_sha, reviews, diff_text)
+    success = post_review_comments(github_token, repo, pr_number, commit_sha, reviews, diff_lines)
     
     sys.exit(0 if success else 1)
 